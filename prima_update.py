@@ -10,13 +10,16 @@ TODO:
     * Придумать что-нибудь с меню (вложенные меню, выбор опции, восстановление из бэкапа, etc.)
 
 """
+import argparse
 import configparser
+import functools
 import os
 import shutil
-from datetime import datetime
+import sys
+import time
 from filecmp import dircmp
-from art import tprint
-from colorama import init, Fore, Style
+from itertools import chain
+from colorama import Fore, Style
 
 # Читаем файл с настройками и объявляем глобальные переменные.
 config = configparser.ConfigParser()
@@ -24,25 +27,59 @@ config.read("settings.ini")
 DIR_SOURCE = config['Global']['server_directory']
 DIR_DESTINATION = config['Global']['local_directory']
 IGNORE = config['Ignore']['list'].split(sep=',')  # Список файлов и папок для игнорирования.
+PRIMA_EXE = os.path.join(DIR_DESTINATION, 'PRIMA.exe')  # Путь к файлу PRIMA.exe
 
-# Добавляем краски в терминал
-init(autoreset=True)
+# Цвета сообщений. Сам colorama инициализируется в main().
 MESSAGE_FAILED = Fore.RED + Style.BRIGHT + "[FAILED] " + Style.RESET_ALL + Fore.RED
 MESSAGE_ATTENTION = Fore.YELLOW + Style.BRIGHT + "[ATTENTION] " + Style.RESET_ALL + Fore.YELLOW
 MESSAGE_OK = Fore.GREEN + Style.BRIGHT + "[OK] " + Style.RESET_ALL + Fore.GREEN
 MESSAGE_WARNING = Fore.BLUE + Style.BRIGHT + "[WARNING] " + Style.RESET_ALL + Fore.BLUE
 
+# Текст меню выбора действия
+MENU_TEXT = '''
+Выберите действие и нажмите Enter:
+ [1] Для замены измененных файлов.
+ [2] Для копирования отсутствующих файлов.
+ [3] Для внесения всех изменений.
+ [4] Для полного копирования.
+ [5] Для пропуска (без изменений).
+    '''
+# Допустимые ответы пользователя и соответствующие им действия
+MENU_CHOICES = {'1': 1, '2': 2, '3': 3, '4': 4, '5': 5}
+
 
 def clear_terminal():
     """
     Clears the terminal screen.
 
-    This function is used to clear the terminal screen by executing the appropriate command based
-    on the operating system. If the operating system is Windows, the 'cls' command is executed.
-    Otherwise, the 'clear' command is executed.
+    If stdout is a terminal, the ANSI sequence for clearing the screen is written directly
+    (colorama translates it on Windows), which avoids spawning a shell process. Otherwise the
+    'cls' command is executed on Windows and the 'clear' command on other systems.
+
+    """
+    if sys.stdout.isatty():
+        sys.stdout.write('\x1b[2J\x1b[H')
+        sys.stdout.flush()
+    else:
+        os.system('cls' if os.name == 'nt' else 'clear')
+
 
+@functools.lru_cache(maxsize=None)
+def format_mtime(mtime, fmt):
     """
-    os.system('cls' if os.name == 'nt' else 'clear')
+    Formats a file modification time.
+
+    The result is cached, so formatting the same time twice (e.g. PRIMA.exe for the backup name
+    and for the shortcut) is done only once.
+
+    Args:
+        mtime (float): The modification time in seconds since the epoch.
+        fmt (str): The strftime format string.
+
+    Returns:
+        str: The formatted date.
+    """
+    return time.strftime(fmt, time.localtime(mtime))
 
 
 def update_lnk():
@@ -55,44 +92,51 @@ def update_lnk():
         FileNotFoundError: If the PRIMA executable file is not found in the source directory.
     """
     path = os.path.expanduser('~\\Desktop\\')
-    date_change = os.path.getmtime(os.path.join(DIR_DESTINATION, 'PRIMA.exe'))
-    new_date = datetime.fromtimestamp(date_change).strftime('%d.%m.%y')
-    for file in os.listdir(path):
-        if '[PRIMA]' in file:
-            old_name = file
-            if new_date in old_name:
+    date_change = os.path.getmtime(PRIMA_EXE)
+    new_date = format_mtime(date_change, '%d.%m.%y')
+    new_name = f'[PRIMA] {new_date}.lnk'
+    with os.scandir(path) as entries:
+        for entry in entries:
+            old_name = entry.name
+            if old_name == new_name:
                 return
-            else:
-                os.rename(os.path.join(path, old_name), os.path.join(path, f'[PRIMA] {new_date}.lnk'))
+            if '[PRIMA]' in old_name and old_name.endswith('.lnk'):
+                os.replace(entry.path, os.path.join(path, new_name))
                 print(f'{MESSAGE_OK}Ярлык на Рабочем столе изменен на [PRIMA] {new_date}')
                 return
     print(f'{MESSAGE_FAILED}Ярлык на рабочем столе не найден')
 
 
 def backup_prima_exe():
-    prima_exe_path = os.path.join(DIR_DESTINATION, 'PRIMA.exe')  # Путь к файлу PRIMA.exe
-    if not os.path.exists(prima_exe_path):
+    # Проверяем наличие файла и получаем дату его изменения одним вызовом stat
+    try:
+        prima_stat = os.stat(PRIMA_EXE)
+    except FileNotFoundError:
         print(f'{MESSAGE_FAILED}Файл PRIMA.exe не найден в целевой директории.')
         return
-
-    # Получаем дату изменения файла
-    date_change = os.path.getmtime(prima_exe_path)
-    date_str = datetime.fromtimestamp(date_change).strftime('%d.%m.%y')
+    date_change = prima_stat.st_mtime
+    date_str = format_mtime(date_change, '%d.%m.%y')
 
     # Формируем новое имя для бэкапа
     backup_name = f'PRIMA[{date_str}].exe'
     backup_path = os.path.join(DIR_DESTINATION, backup_name)
 
-    if os.path.exists(backup_path):
+    # Один вызов stat вместо пары exists/getmtime
+    try:
+        backup_date_change = os.stat(backup_path).st_mtime
+    except FileNotFoundError:
+        backup_date_change = None
+    if backup_date_change is not None:
         print(f'{MESSAGE_OK}Бэкап уже существует: {backup_name}')
-        if os.path.getmtime(backup_path) >= date_change:
+        if backup_date_change >= date_change:
             print(f'{MESSAGE_OK}Бэкап актуален')
             return
         else:
             os.remove(backup_path)
-    # Переименовываем файл
+    # Копируем файл. Из метаданных нужна только дата изменения: по ней проверяется актуальность.
     try:
-        shutil.copy2(prima_exe_path, backup_path)
+        shutil.copyfile(PRIMA_EXE, backup_path)
+        os.utime(backup_path, ns=(prima_stat.st_atime_ns, prima_stat.st_mtime_ns))
         print(f'{MESSAGE_OK}Бэкап создан: {backup_name}')
     except Exception as e:
         print(f'{MESSAGE_FAILED}Не удалось создать бэкап: {e}')
@@ -103,7 +147,7 @@ def copy_diff_files(files):
     Copies the specified files to a destination directory.
 
     Args:
-        files (List[str]): A list of file paths to be copied.
+        files (Iterable[str]): The file paths to be copied.
 
     Returns:
         None
@@ -112,9 +156,11 @@ def copy_diff_files(files):
         OSError: If an error occurs while copying the files.
     """
 
+    source_len = len(DIR_SOURCE)
     for file in files:
         source = file
-        destination = file.replace(DIR_SOURCE, DIR_DESTINATION)
+        # Все пути начинаются с DIR_SOURCE, поэтому достаточно заменить префикс.
+        destination = DIR_DESTINATION + file[source_len:]
         if os.path.isdir(file):
             try:
                 shutil.copytree(source, destination)
@@ -142,7 +188,7 @@ def copy_tree():
         print(f'{MESSAGE_FAILED}Копирование не удалось')
 
 
-def diff_files(dcmp, diff_lst: list, only_lst: list):
+def diff_files(dcmp, diff_lst: list, only_lst: list, report: list):
     """
     Generate a list of files that are different or missing between two directories.
 
@@ -150,17 +196,16 @@ def diff_files(dcmp, diff_lst: list, only_lst: list):
         dcmp (dc.DirCmp): A directory comparison object.
         diff_lst (list): A list to store the paths of different files.
         only_lst (list): A list to store the paths of missing files.
+        report (list): A list to store the report lines, printed by the caller in one go.
     """
-    if dcmp.diff_files:
-        for file in dcmp.diff_files:
-            print(f'{MESSAGE_ATTENTION}[*] Файл изменен: {file}')
-            diff_lst.append(f'{dcmp.left}\\{file}')
-    if dcmp.left_only:
-        for file in dcmp.left_only:
-            print(f'{MESSAGE_ATTENTION}[-] Файл отсутствует: {file}')
-            only_lst.append(f'{dcmp.left}\\{file}')
+    for file in dcmp.diff_files:
+        report.append(f'{MESSAGE_ATTENTION}[*] Файл изменен: {file}')
+        diff_lst.append(f'{dcmp.left}\\{file}')
+    for file in dcmp.left_only:
+        report.append(f'{MESSAGE_ATTENTION}[-] Файл отсутствует: {file}')
+        only_lst.append(f'{dcmp.left}\\{file}')
     for sub_dcmp in dcmp.subdirs.values():
-        diff_files(sub_dcmp, diff_lst, only_lst)
+        diff_files(sub_dcmp, diff_lst, only_lst, report)
 
 
 def user_interface():
@@ -170,62 +215,72 @@ def user_interface():
     Returns:
         int: The user's chosen action, which is a number between 1 and 5.
     """
-    print('''
-Выберите действие и нажмите Enter:
- [1] Для замены измененных файлов.
- [2] Для копирования отсутствующих файлов.
- [3] Для внесения всех изменений.
- [4] Для полного копирования.
- [5] Для пропуска (без изменений).
-    ''')
+    print(MENU_TEXT)
     while True:
-        answer = input('Выберите действие: ')
-        if answer.isdecimal() and 1 <= int(answer) <= 5:
-            return int(answer)
+        choice = MENU_CHOICES.get(input('Выберите действие: ').strip())
+        if choice is not None:
+            return choice
         else:
             print('Неверный ввод повторить')
 
 
+def parse_arguments():
+    """
+    Parses the command line arguments.
+
+    Returns:
+        argparse.Namespace: The parsed arguments. If `action` is set, the menu is not shown.
+    """
+    parser = argparse.ArgumentParser(description='Обновление PRIMA с сервера.')
+    parser.add_argument('-a', '--action', choices=MENU_CHOICES,
+                        help='номер действия из меню; если указан, меню не выводится')
+    return parser.parse_args()
+
+
 def main():
     """
 	This function is the main entry point of the program.
 
     It clears the terminal, prints the program name, and checks for changes between two directories.
-    It then prompts the user for a choice and performs different actions based on the user's input.
+    It then prompts the user for a choice (unless it was given with --action) and performs
+    different actions based on it.
     The function returns nothing.
 
 	"""
-    # Выводим название программы
+    args = parse_arguments()
+
+    # Тяжелые зависимости импортируем только при запуске программы
+    from art import tprint
+    from colorama import init
+
+    # Добавляем краски в терминал и выводим название программы
+    init(autoreset=True)
     clear_terminal()
     tprint('PRIMA - UPDATER', font='tarty1')
 
     diff_object = dircmp(DIR_SOURCE, DIR_DESTINATION, IGNORE)
     print('\nПроверка наличия изменений:')
-    diff, only = [], []
-    diff_files(diff_object, diff, only)
+    diff, only, report = [], [], []
+    diff_files(diff_object, diff, only, report)
+    if report:
+        print('\n'.join(report))
     if not diff and not only:
         print(f'{MESSAGE_OK}Изменений не обнаружено.')
         return
-    choice = user_interface()
-    if choice == 1:
-        backup_prima_exe()
-        copy_diff_files(diff)
-        update_lnk()
-    elif choice == 2:
-        backup_prima_exe()
-        copy_diff_files(only)
-        update_lnk()
-    elif choice == 3:
-        backup_prima_exe()
-        copy_diff_files(diff + only)
-        update_lnk()
-    elif choice == 4:
-        backup_prima_exe()
-        copy_tree()
-        update_lnk()
-    elif choice == 5:
+    choice = MENU_CHOICES[args.action] if args.action else user_interface()
+    if choice == 5:
         print(f'{MESSAGE_OK}Изменения внесены не будут.')
-        update_lnk()
+    else:
+        backup_prima_exe()
+        if choice == 1:
+            copy_diff_files(diff)
+        elif choice == 2:
+            copy_diff_files(only)
+        elif choice == 3:
+            copy_diff_files(chain(diff, only))
+        elif choice == 4:
+            copy_tree()
+    update_lnk()
 
 
 # A common idiom to place the main functionality of a Python script in a function called main,